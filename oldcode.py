@@ -1,15 +1,43 @@
 from ftfcu_appworx import Apwx, JobTime
-from email.message import EmailMessage
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from enum import Enum, auto
-from typing import Optional
+from operator import attrgetter
+from typing import Optional, TYPE_CHECKING
 import os
 
 import csv
 import datetime
-import smtplib
+import logging
+import re
+import sys
 
-_version_ = 1.01
+# the mail stack is only needed when a failure has to be reported - imported where it is used
+if TYPE_CHECKING:
+    from email.message import EmailMessage
+
+_version_ = 1.02
+
+logger = logging.getLogger(__name__)
+
+# rows fetched per round-trip when pulling the cleanup result set
+FETCH_ARRAY_SIZE = 10000
+
+# report columns pulled off a fetched record, in report order
+_REPORT_FIELDS = attrgetter('ENTITY_NUMBER', 'ACCTNBR', 'ENTITY_TYPE', 'CLOSE_DATE')
+
+# SYS.ODCINUMBERLIST is a VARRAY(32767) - bigger entity sets are merged a chunk at a time
+ODCI_NUMBER_LIST_MAX = 32767
+
+# bind rows sent per executemany call when merging row by row
+MERGE_BATCH_SIZE = 1000
+
+# SMTP port that expects TLS from the first byte rather than a STARTTLS upgrade
+SMTPS_PORT = 465
+
+# email address pattern - compiled once at import
+_RE_EMAIL = re.compile(r'[\w\.]+@firsttechfed\.com', re.IGNORECASE)
 
 
 class AppWorxEnum(Enum):
@@ -37,16 +65,20 @@ class AppWorxEnum(Enum):
 def run(apwx: Apwx):
     """The main logic of the script goes here"""
 
-    dbh = db_connect(apwx)
+    # read job args & resolve the Y/N flags once up front
+    args = apwx.args
+    is_commit = args.RPTONLY_YN.upper() == 'N'
+    is_send_email = send_email_enabled(apwx)
+    recipients = args.EMAIL_RECIPIENTS
 
-    path = Path(apwx.args.OUTPUT_FILE_PATH) / apwx.args.OUTPUT_FILE_NAME
+    path = Path(args.OUTPUT_FILE_PATH) / args.OUTPUT_FILE_NAME
 
     if path.exists():
         raise FileExistsError(f'Output file already exists at {path}.')
 
     # determine if full scan for records vs. fixed date & get sql
-    is_full_cleanup = True if apwx.args.FULL_CLEANUP_YN.upper() == 'Y' else None
-    run_date = apwx.args.RUN_DATE
+    is_full_cleanup = True if args.FULL_CLEANUP_YN.upper() == 'Y' else None
+    run_date = args.RUN_DATE
 
     # is_full_cleanup and run_date params are mutually exclusive - exit job if either run_date/is_full_cleanup
     # parameters both exist, or neither exist
@@ -60,36 +92,50 @@ def run(apwx: Apwx):
                         f'IS_FULL_CLEANUP={is_full_cleanup} and RUN_DATE={run_date}.')
 
     # start job
-    sql = get_sql(is_full_cleanup=is_full_cleanup, run_date=run_date)
+    pers_sql = get_pers_sql(is_full_cleanup=is_full_cleanup, run_date=run_date)
+    org_sql = get_org_sql(is_full_cleanup=is_full_cleanup, run_date=run_date)
+
+    # RUN_DATE is only referenced by the dated statements
+    binds = {'run_date': run_date} if run_date is not None else {}
 
-    pers_records, org_records = fetch_records(dbh, sql)
+    # connect once the args check out - pers and org records are pulled & updated concurrently, each on its
+    # own session
+    dbh = db_connect(apwx, autocommit=is_commit)
+    org_dbh = db_connect(apwx, autocommit=is_commit)
 
-    successes = list()
-    fails = list()
+    pers_records, org_records = fetch_records(dbh, org_dbh, pers_sql, org_sql, binds)
 
-    successes, fails = update_stdl_userfield(apwx, pers_records, dbh, table_name='persuserfield', col_name='persnbr')
-    o_successes, o_fails = update_stdl_userfield(apwx, org_records, dbh, table_name='orguserfield', col_name='orgnbr')
+    successes = []
+    fails = []
+
+    # nothing to clean up - skip the update sessions entirely
+    if pers_records or org_records:
+        # persuserfield and orguserfield updates are disjoint - run them side by side, each on its own session
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            pers_future = executor.submit(update_stdl_userfield, pers_records, dbh, is_commit,
+                                          table_name='persuserfield', col_name='persnbr')
+            org_future = executor.submit(update_stdl_userfield, org_records, org_dbh, is_commit,
+                                         table_name='orguserfield', col_name='orgnbr')
 
-    successes.extend(o_successes)
-    fails.extend(o_fails)
+            successes, fails = pers_future.result()
+            o_successes, o_fails = org_future.result()
 
-    path = Path(apwx.args.OUTPUT_FILE_PATH) / apwx.args.OUTPUT_FILE_NAME
+        successes.extend(o_successes)
+        fails.extend(o_fails)
 
-    if successes:
-        write_report(path, successes, write_mode='w')
-    if fails:
-        write_report(path, fails, write_mode='a+')
+    if successes or fails:
+        write_report(path, successes, fails)
 
     # send email if fails and at least one recipient
-    if fails and apwx.args.EMAIL_RECIPIENTS:
-        recipients = apwx.args.EMAIL_RECIPIENTS.split(',')
-        successful, message = send_email(apwx, recipients)
-        print(f"Email notification result: {message}")
-    elif fails and apwx.args.EMAIL_RECIPIENTS is None and send_email_enabled(apwx):
-        print(f'SEND_EMAIL_YN == {apwx.args.SEND_EMAIL_YN}. No email recipients found.')
+    if fails and recipients:
+        successful, message = send_email(apwx, recipients, is_send_email)
+        logger.info('Email notification result: %s', message)
+    elif fails and recipients is None and is_send_email:
+        logger.info('SEND_EMAIL_YN == %s. No email recipients found.', args.SEND_EMAIL_YN)
     else:
-        print(f'No failed inserts/updates to report. No notification email(s) sent.')
+        logger.info('No failed inserts/updates to report. No notification email(s) sent.')
 
+    org_dbh.close()
     dbh.close()
 
     return True
@@ -113,71 +159,88 @@ def parse_args(apwx: Apwx) -> Apwx:
     parser.add_arg(str(AppWorxEnum.RPTONLY_YN), choices=['Y', 'N'], required=True)
     parser.add_arg(str(AppWorxEnum.FULL_CLEANUP_YN), choices=['Y', 'N'], required=True)
     parser.add_arg(str(AppWorxEnum.SEND_EMAIL_YN), choices=['Y', 'N'], required=True)
-    parser.add_arg(str(AppWorxEnum.EMAIL_RECIPIENTS), type=r'([\w\.]+@firsttechfed\.com,?)+', ignore_case=True, required=True)
+    parser.add_arg(str(AppWorxEnum.EMAIL_RECIPIENTS), type=email_list_validator, required=True)
     parser.add_arg(str(AppWorxEnum.SMTP_SERVER), type=str, required=True)
     parser.add_arg(str(AppWorxEnum.SMTP_PORT), type=int, required=True)
     parser.add_arg(str(AppWorxEnum.SMTP_USER), type=str, required=True)
     parser.add_arg(str(AppWorxEnum.SMTP_PASSWORD), type=str, required=True)
-    parser.add_arg(str(AppWorxEnum.FROM_EMAIL_ADDR), type=r'[\w\.]+@firsttechfed\.com', default='AM_PROD@firsttechfed.com',
-                   required=False, ignore_case=True)
+    parser.add_arg(str(AppWorxEnum.FROM_EMAIL_ADDR), type=regex_validator(_RE_EMAIL), default='AM_PROD@firsttechfed.com',
+                   required=False)
     parser.add_arg(str(AppWorxEnum.TEST_EMAIL_ADDR), type=str, required=False)
 
     apwx.parse_args()
     return apwx
 
 
-def db_connect(apwx):
-    dbh = apwx.db_connect()
+def regex_validator(pattern: re.Pattern):
+    """Builds an argument validator around a precompiled pattern"""
+    def validate(value: str) -> str:
+        if not pattern.fullmatch(value):
+            raise ValueError(f'{value} does not match {pattern.pattern}')
+        return value
 
-    if apwx.args.RPTONLY_YN.upper() == 'N':
-        dbh.autocommit = True
-    else:
-        dbh.autocommit = False
+    return validate
 
-    return dbh
 
+def email_list_validator(value: str) -> tuple:
+    """Validates a comma separated list of email addresses, returns them already split"""
+    addresses = tuple(address.strip() for address in value.split(',') if address.strip())
 
-def get_sql(is_full_cleanup=None, run_date=None):
-    close_date_join = ''
+    if not addresses or not all(_RE_EMAIL.fullmatch(address) for address in addresses):
+        raise ValueError(f'{value} is not a comma separated list of {_RE_EMAIL.pattern} addresses')
 
-    if is_full_cleanup is None and run_date is not None:
-        close_date_join = f"""
-            JOIN acctacctstathist ah
+    return addresses
+
+
+def db_connect(apwx, autocommit: bool):
+    # commit as we go unless this is a report-only run - set once at connect time
+    return apwx.db_connect(autocommit=autocommit)
+
+
+# close-date joins pick the latest status history row per account in one analytic pass over
+# acctacctstathist - only CLS rows can match a.curracctstatcd, so the rest are filtered out up front.
+# with one history row per account and one STDL userfield per entity, each (entity, acctnbr) comes
+# back exactly once, so the selects below need no DISTINCT
+_CLOSE_DATE_JOIN_DATED = """
+            JOIN (
+                SELECT
+                    acctnbr,
+                    acctstatcd,
+                    effdatetime,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY acctnbr, acctstatcd
+                        ORDER BY effdatetime DESC, timeuniqueextn DESC
+                    ) rn
+                FROM acctacctstathist
+                WHERE acctstatcd = 'CLS'
+                AND effdatetime >= TO_DATE(:run_date, 'mm-dd-yyyy')
+                AND effdatetime < TO_DATE(:run_date, 'mm-dd-yyyy') + 1
+            ) ah
                 ON a.acctnbr = ah.acctnbr
-                AND ah.acctstatcd = a.curracctstatcd 
-                AND TRUNC(ah.effdatetime) = TO_DATE('{run_date}', 'mm-dd-yyyy')
-                AND ah.timeuniqueextn = (
-                    SELECT MAX(timeuniqueextn)
-                    FROM acctacctstathist
-                    WHERE acctnbr = ah.acctnbr
-                    AND acctstatcd = ah.acctstatcd
-                    AND effdatetime = ah.effdatetime
-                )
+                AND ah.acctstatcd = a.curracctstatcd
+                AND ah.rn = 1
         """
-    else:
-        close_date_join = f"""
-            JOIN acctacctstathist ah
+
+_CLOSE_DATE_JOIN_FULL = """
+            JOIN (
+                SELECT
+                    acctnbr,
+                    acctstatcd,
+                    effdatetime,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY acctnbr, acctstatcd
+                        ORDER BY effdatetime DESC, timeuniqueextn DESC
+                    ) rn
+                FROM acctacctstathist
+                WHERE acctstatcd = 'CLS'
+            ) ah
                 ON a.acctnbr = ah.acctnbr
-                AND ah.acctstatcd = a.curracctstatcd 
-                AND ah.effdatetime = (
-                    SELECT MAX(effdatetime)
-                    FROM acctacctstathist
-                    WHERE acctnbr = ah.acctnbr
-                    AND acctstatcd = ah.acctstatcd
-                    AND timeuniqueextn = ah.timeuniqueextn
-                )
-                AND ah.timeuniqueextn = (
-                    SELECT MAX(timeuniqueextn)
-                    FROM acctacctstathist
-                    WHERE acctnbr = ah.acctnbr
-                    AND acctstatcd = ah.acctstatcd
-                    AND effdatetime = ah.effdatetime
-                )           
+                AND ah.acctstatcd = a.curracctstatcd
+                AND ah.rn = 1
         """
 
-    # start query
-    sql = f'''
-        SELECT DISTINCT
+_PERS_SQL_TEMPLATE = '''
+        SELECT
             'pers' as entity_type,
             p.persnbr as entity_number,
             a.acctnbr,
@@ -253,9 +316,10 @@ def get_sql(is_full_cleanup=None, run_date=None):
             )
         )
 
-        UNION
+    '''
 
-        SELECT DISTINCT
+_ORG_SQL_TEMPLATE = '''
+        SELECT
             'org' as entity_type,
             o.orgnbr as entity_number,
             a.acctnbr,
@@ -332,37 +396,22 @@ def get_sql(is_full_cleanup=None, run_date=None):
 
     '''
 
-    return sql
-
+# build the statements once at import - RUN_DATE is a bind variable, so the statement text never changes
+# between runs and Oracle can reuse the parsed cursor
+_PERS_SQL_FULL = _PERS_SQL_TEMPLATE.format(close_date_join=_CLOSE_DATE_JOIN_FULL)
+_PERS_SQL_DATED = _PERS_SQL_TEMPLATE.format(close_date_join=_CLOSE_DATE_JOIN_DATED)
+_ORG_SQL_FULL = _ORG_SQL_TEMPLATE.format(close_date_join=_CLOSE_DATE_JOIN_FULL)
+_ORG_SQL_DATED = _ORG_SQL_TEMPLATE.format(close_date_join=_CLOSE_DATE_JOIN_DATED)
 
-def fetch_records(dbh, sql):
-    with dbh.cursor() as cursor:
-        cursor.execute(sql)
 
-        # change result format from tuples to dictionary
-        columns = [col[0] for col in cursor.description]
-        cursor.rowfactory = lambda *args: dict(zip(columns, args))
-
-        records = cursor.fetchall()
-
-        # split records by entity types & remove dups w/
-        pers_records = [r for r in records if r['ENTITY_TYPE'] == 'pers']
-        org_records = [r for r in records if r['ENTITY_TYPE'] == 'org']
-
-    return pers_records, org_records
-
-
-def update_stdl_userfield(apwx, records, dbh, table_name=None, col_name=None):
-    filtered_nbrs = list(set(r['ENTITY_NUMBER'] for r in records))
-    entity_nbrs = [[r] for r in filtered_nbrs]
-    successes = []
-    fails = []
+# merge sources - a whole collection of entity nbrs, or one bind row at a time via executemany
+_MERGE_SOURCE_SET = 'COLUMN_VALUE entity_nbr FROM TABLE(:nbrs)'
+_MERGE_SOURCE_ROW = ':1 entity_nbr FROM DUAL'
 
-    sql_merge = f''' 
+_MERGE_SQL_TEMPLATE = '''
                 MERGE INTO {table_name} pu
                 USING ( SELECT
-                            :1 entity_nbr
-                      FROM DUAL
+                            {source}
                 ) x 
                 ON (pu.{col_name} = x.entity_nbr 
                 AND pu.userfieldcd = 'STDL' )
@@ -385,110 +434,201 @@ def update_stdl_userfield(apwx, records, dbh, table_name=None, col_name=None):
                     )   
                 '''
 
-    sth = dbh.cursor()
+# merge statements per userfield table - built once so every run reuses the same statement text
+_MERGE_SQL_SET = {
+    'persuserfield': _MERGE_SQL_TEMPLATE.format(table_name='persuserfield', col_name='persnbr',
+                                                source=_MERGE_SOURCE_SET),
+    'orguserfield': _MERGE_SQL_TEMPLATE.format(table_name='orguserfield', col_name='orgnbr',
+                                               source=_MERGE_SOURCE_SET),
+}
+_MERGE_SQL_ROW = {
+    'persuserfield': _MERGE_SQL_TEMPLATE.format(table_name='persuserfield', col_name='persnbr',
+                                                source=_MERGE_SOURCE_ROW),
+    'orguserfield': _MERGE_SQL_TEMPLATE.format(table_name='orguserfield', col_name='orgnbr',
+                                               source=_MERGE_SOURCE_ROW),
+}
+
+
+def get_pers_sql(is_full_cleanup=None, run_date=None):
+    if is_full_cleanup is None and run_date is not None:
+        return _PERS_SQL_DATED
 
-    sth.executemany(sql_merge, entity_nbrs, batcherrors=True)
+    return _PERS_SQL_FULL
 
-    batch_errors = sth.getbatcherrors()
 
-    if batch_errors:
-        for error in batch_errors:
-            # get index
-            error_idx = error.offset
+def get_org_sql(is_full_cleanup=None, run_date=None):
+    if is_full_cleanup is None and run_date is not None:
+        return _ORG_SQL_DATED
 
-            # get entity nbr from merge list
-            merge_ent_nbr = entity_nbrs[error_idx]
+    return _ORG_SQL_FULL
 
-            print(f'Error {error.message} at row {error_idx} during merge.'
-                  f"{col_name}: {merge_ent_nbr}")
 
-            # if failed entity nbr exists, add fail message to record for reporting
-            for rec in records:
-                if rec['ENTITY_NUMBER'] == merge_ent_nbr:
-                    fails.append(
-                        (
-                            merge_ent_nbr,
-                            rec['ACCTNBR'],
-                            rec['ENTITY_TYPE'],
-                            rec['CLOSE_DATE'],
-                            'Fail',
-                         )
-                    )
+def fetch_records(pers_dbh, org_dbh, pers_sql, org_sql, binds):
+    # the two halves drive off different tables - run them side by side, the GIL is released while
+    # each thread waits on Oracle
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        pers_future = executor.submit(execute_sql_select, pers_dbh, pers_sql, binds)
+        org_future = executor.submit(execute_sql_select, org_dbh, org_sql, binds)
 
-    if apwx.args.RPTONLY_YN.upper() == 'N':
-        dbh.commit()
-    else:
-        dbh.rollback()
+        pers_records = pers_future.result()
+        org_records = org_future.result()
+
+    return pers_records, org_records
+
+
+def execute_sql_select(dbh, sql, binds):
+    with dbh.cursor() as cursor:
+        # fetch in large batches to cut network round-trips on big result sets
+        cursor.arraysize = FETCH_ARRAY_SIZE
+        cursor.prefetchrows = FETCH_ARRAY_SIZE + 1
+        cursor.execute(sql, binds)
+
+        # change result format from plain tuples to named tuples - fields read by column name without a
+        # per-row dict
+        columns = [col[0] for col in cursor.description]
+        cursor.rowfactory = namedtuple('Record', columns)
+
+        # stream rows off the cursor
+        records = list(cursor)
+
+    return records
+
+
+def update_stdl_userfield(records, dbh, is_commit, table_name=None, col_name=None):
+    # no records for this entity type - don't open a cursor or look up the collection type
+    if not records:
+        logger.info('No records to update in %s table.', table_name)
+        return [], []
+
+    # de-dup entity nbrs (an entity can have several closed accounts), keeping fetch order
+    entity_nbrs = list(dict.fromkeys(r.ENTITY_NUMBER for r in records))
 
-    successes = [(r['ENTITY_NUMBER'], r['ACCTNBR'], r['ENTITY_TYPE'], r['CLOSE_DATE'], 'Success') for r in records
-                 if r['ENTITY_NUMBER'] not in fails]
+    successes = []
+    fails = []
+    failed_nbrs = set()
+    merged_count = 0
 
-    print(f'Number Of Updated Records in {table_name} table : ', sth.rowcount, '\n')
+    sql_merge_set = _MERGE_SQL_SET[table_name]
+    sql_merge_rows = _MERGE_SQL_ROW[table_name]
+
+    sth = dbh.cursor()
+
+    # merge the whole set server side - one statement per SYS.ODCINUMBERLIST sized chunk of nbrs
+    nbr_list_type = dbh.gettype('SYS.ODCINUMBERLIST')
+
+    for i in range(0, len(entity_nbrs), ODCI_NUMBER_LIST_MAX):
+        try:
+            sth.execute(sql_merge_set, nbrs=nbr_list_type.newobject(entity_nbrs[i:i + ODCI_NUMBER_LIST_MAX]))
+        except Exception as e:
+            # a failed statement is rolled back as a whole - merge what is left row by row so each failure
+            # can be reported against its entity nbr
+            logger.warning('Set based merge into %s failed, retrying row by row. %s', table_name, e)
+            row_count, row_failed_nbrs = merge_by_row(sth, sql_merge_rows, entity_nbrs[i:], col_name)
+            merged_count += row_count
+            failed_nbrs.update(row_failed_nbrs)
+            break
+
+        merged_count += sth.rowcount
+
+    # under autocommit the merges are already committed - only finish the transaction ourselves otherwise
+    if not dbh.autocommit:
+        if is_commit:
+            dbh.commit()
+        else:
+            dbh.rollback()
+
+    # build report rows in a single pass over records - an entity can have several closed accounts
+    if not failed_nbrs:
+        successes = [(*_REPORT_FIELDS(r), 'Success') for r in records]
+    else:
+        for r in records:
+            if r.ENTITY_NUMBER in failed_nbrs:
+                fails.append((*_REPORT_FIELDS(r), 'Fail'))
+            else:
+                successes.append((*_REPORT_FIELDS(r), 'Success'))
+
+    logger.info('Number Of Updated Records in %s table : %s', table_name, merged_count)
 
     sth.close()
 
     return successes, fails
 
 
-def write_report(path, records, write_mode):
-    run_date = datetime.datetime.today().strftime('%m-%d-%Y')
+def merge_by_row(sth, sql_merge, entity_nbrs, col_name):
+    """Merges entity nbrs as arrays of single-row binds, returns the merged row count and the failed nbrs"""
+    merged_count = 0
+    failed_nbrs = set()
 
-    with open(path, write_mode, newline='') as csv_file:
-        writer = csv.writer(csv_file)
+    # parse once, then stream the binds through in fixed size batches
+    sth.prepare(sql_merge)
+
+    for i in range(0, len(entity_nbrs), MERGE_BATCH_SIZE):
+        batch_nbrs = entity_nbrs[i:i + MERGE_BATCH_SIZE]
 
-        if write_mode == 'w':
-            header = ['ENTITY_NBR', 'ACCTNBR', 'ENTITY_TYPE', 'CLOSE_DATE', 'RESULT']
-            writer.writerow(header)
+        # entity nbrs are all numeric - declare the bind type once for the whole array
+        sth.setinputsizes(int)
+        sth.executemany(None, list(zip(batch_nbrs)), batcherrors=True, arraydmlrowcounts=True)
 
-        for rec in records:
-            # create dict from header (keys) and tuple (values) - used to ensure field order is consistent
-            r = dict(zip(header, rec))
+        for error in sth.getbatcherrors():
+            logger.error('Error %s at row %s during merge. %s: %s', error.message, i + error.offset, col_name,
+                         batch_nbrs[error.offset])
 
-            row = [
-                r['ENTITY_NBR'],
-                r['ACCTNBR'],
-                r['ENTITY_TYPE'],
-                r['CLOSE_DATE'],
-                r['RESULT']
-            ]
+        # per-row counts tell us which entity nbrs merged - anything that touched no rows failed
+        row_counts = sth.getarraydmlrowcounts()
+        merged_count += sum(row_counts)
+        failed_nbrs.update(nbr for nbr, row_count in zip(batch_nbrs, row_counts) if not row_count)
 
-            writer.writerow(row)
+    return merged_count, failed_nbrs
+
+
+def write_report(path, successes, fails):
+    with open(path, 'w', newline='') as csv_file:
+        writer = csv.writer(csv_file)
+
+        header = ['ENTITY_NBR', 'ACCTNBR', 'ENTITY_TYPE', 'CLOSE_DATE', 'RESULT']
+        writer.writerow(header)
+
+        # rows are already tuples in header order
+        writer.writerows(successes)
+        writer.writerows(fails)
 
     return True
 
 
-def send_email(apwx: Apwx, recipients: list) -> (bool, str):
+def send_email(apwx: Apwx, recipients: tuple, is_send_email: bool) -> (bool, str):
     """Send email notification for failed updates"""
-    to_address = recipients[0] if recipients else None
+    to_addresses = list(recipients) if recipients else []
     if apwx.args.TEST_EMAIL_ADDR:
-        to_address = apwx.args.TEST_EMAIL_ADDR
+        to_addresses = [apwx.args.TEST_EMAIL_ADDR]
     from_address = apwx.args.FROM_EMAIL_ADDR
 
-    if not to_address:
+    if not to_addresses:
         return False, "No email recipients"
 
-    # Create the email content
+    # Create the email content - one message addressed to every recipient
     email_content = generate_email_content()
-    email_message = generate_email_message(from_address, to_address, email_content)
+    email_message = generate_email_message(from_address, to_addresses, email_content)
 
     # Don't send if we're on local dev env or the SEND_EMAIL_YN parameter is N
-    if is_local_environment() or not send_email_enabled(apwx):
+    if is_local_environment() or not is_send_email:
         return False, "Email Send Disabled"
 
     try:
-        send_smtp_request(apwx, from_address, to_address, email_message)
+        send_smtp_request(apwx, [email_message])
         return True, "Email Sent"
     except Exception as e:
-        print(f"An exception was encountered sending email to {to_address}.", e)
+        logger.error('An exception was encountered sending email to %s. %s', ', '.join(to_addresses), e)
         return False, "Email Failed"
 
 
-def generate_email_message(from_address: str, to_address: str, email_content: str) -> EmailMessage:
+def generate_email_message(from_address: str, to_addresses: list, email_content: str) -> 'EmailMessage':
     """Generate email message object"""
+    from email.message import EmailMessage
+
     message = EmailMessage()
     message["Subject"] = "Statement Delivery Method Update Alert"
     message["From"] = f"First Tech Federal Credit Union <{from_address}>"
-    message["To"] = to_address
+    message["To"] = ", ".join(to_addresses)
     message.set_content(email_content)
     message.set_type("text/html")
     return message
@@ -500,23 +640,30 @@ def generate_email_content() -> str:
     return content
 
 
-def send_smtp_request(apwx: Apwx, from_address: str, to_address: str, email_message: EmailMessage):
-    """Send email request to SMTP server"""
+def send_smtp_request(apwx: Apwx, email_messages: list):
+    """Send email message(s) to SMTP server over a single session"""
+    import smtplib
+
     smtp_server = apwx.args.SMTP_SERVER
     smtp_port = int(apwx.args.SMTP_PORT)
     smtp_user = apwx.args.SMTP_USER
     smtp_password = apwx.args.SMTP_PASSWORD
 
-    with smtplib.SMTP(smtp_server, smtp_port) as server:
-        print(f"Connecting to SMTP server {smtp_server}:{smtp_port}")
-        server.connect(smtp_server, smtp_port)
-        server.ehlo()
-        server.starttls()
-        server.ehlo()
-        print(f"Logging into {smtp_server} as {smtp_user}")
+    # implicit TLS on the SMTPS port, otherwise upgrade the plain connection with STARTTLS
+    use_ssl = smtp_port == SMTPS_PORT
+    smtp_class = smtplib.SMTP_SSL if use_ssl else smtplib.SMTP
+
+    # the SMTP constructor connects - reuse this session for every message, EHLO is sent as needed by
+    # starttls/login
+    logger.info('Connecting to SMTP server %s:%s', smtp_server, smtp_port)
+    with smtp_class(smtp_server, smtp_port) as server:
+        if not use_ssl:
+            server.starttls()
+        logger.info('Logging into %s as %s', smtp_server, smtp_user)
         server.login(smtp_user, smtp_password)
-        print(f"Sending email...")
-        server.sendmail(from_address, to_address, email_message.as_string())
+        for email_message in email_messages:
+            logger.info('Sending email to %s...', email_message['To'])
+            server.send_message(email_message)
 
 
 def is_local_environment() -> bool:
@@ -530,6 +677,9 @@ def send_email_enabled(apwx: Apwx) -> bool:
 
 
 if __name__ == '__main__':
+    # AppWorx captures stdout for the job log - timestamp each line once in the formatter
+    logging.basicConfig(stream=sys.stdout, format='%(asctime)s %(levelname)s %(message)s', level=logging.INFO)
+
     JobTime().print_start()
     run(parse_args(get_apwx()))
     JobTime().print_end()